@@ -17,14 +17,28 @@ Applying principles from https://github.com/humanlayer/12-factor-agents:
 """
 
 import os
+import re
 import subprocess
 import json
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, asdict
+import hashlib
+import logging
+import selectors
+import signal
+import tempfile
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, TextIO, Tuple, Union
+from dataclasses import dataclass, field
+from contextlib import suppress
+from datetime import datetime, timezone
 from enum import Enum
 import asyncio
-from agents import Agent, function_tool, Runner, RunContextWrapper
-from agents.extensions.models.litellm_model import LitellmModel
+from functools import cached_property, lru_cache
+from agents import Agent, ModelSettings, function_tool, Runner, RunConfig, RunContextWrapper
+from openai.types.responses import ResponseTextDeltaEvent
+
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -48,6 +62,89 @@ Format the output as:
 - Keep it concise but informative
 """
 
+# Static task instructions, sent right after the system prompt. Request
+# parameters are deliberately kept out of this text so it stays cacheable.
+TASK_PROMPT = """Create professional release notes for the repository described in \
+the next message. Its commit history is provided after that; use it as given."""
+
+# Providers that need explicit cache_control markers for prompt caching.
+# OpenAI-compatible providers cache identical prefixes automatically, so for
+# them it is enough that SYSTEM_PROMPT is always sent verbatim as the first block.
+CACHE_CONTROL_PROVIDERS = ("anthropic/",)
+
+
+def prompt_cache_settings(model_name: str) -> ModelSettings:
+    """Mark the static system prompt as cacheable for providers that need it"""
+    if not model_name.startswith(CACHE_CONTROL_PROVIDERS):
+        return ModelSettings()
+    # LiteLLM rewrites the system message and the static task message
+    # (index 1) into text blocks carrying cache_control={"type": "ephemeral"}
+    return ModelSettings(extra_args={
+        "cache_control_injection_points": [
+            {"location": "message", "role": "system"},
+            {"location": "message", "index": 1},
+        ],
+    })
+
+
+def log_prompt_cache_usage(result: Any) -> None:
+    """Log how much of the prompt was served from the provider's prefix cache"""
+    usage = result.context_wrapper.usage
+    if not usage.input_tokens:
+        return
+    cached = usage.input_tokens_details.cached_tokens or 0
+    logger.info(
+        "Prompt cache: %d/%d input tokens cached (%.0f%% hit ratio)",
+        cached, usage.input_tokens, 100 * cached / usage.input_tokens
+    )
+
+
+# ============================================================================
+# Factor 2: Configuration - Read from the environment once, explicitly
+# ============================================================================
+
+DEFAULT_MODEL_NAME = "groq/openai/gpt-oss-120b"
+DEFAULT_REPO_PATH = "/Users/annhoward/src/docusign_clone"
+
+
+@dataclass(frozen=True, slots=True)
+class AgentConfig:
+    """Immutable agent configuration, validated once at construction.
+    
+    Equality and hashing cover only what identifies an Agent - model_name and
+    api_key_hash - so configs key the agent cache without exposing the key
+    and without duplicating agents for different default paths.
+    """
+    model_name: str = DEFAULT_MODEL_NAME
+    api_key: Optional[str] = field(default=None, repr=False, compare=False)
+    repo_path: str = field(default=DEFAULT_REPO_PATH, compare=False)
+    file_path: str = field(default="", compare=False)
+    api_key_hash: bytes = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        if not self.api_key:
+            raise ValueError("API key required: set GROQ_API_KEY environment variable")
+        object.__setattr__(
+            self, "api_key_hash",
+            hashlib.blake2b(self.api_key.encode(), digest_size=16).digest()
+        )
+    
+    @classmethod
+    def from_env(cls, model_name: Optional[str] = None, api_key: Optional[str] = None) -> "AgentConfig":
+        """Build config from environment variables; explicit arguments take precedence"""
+        return cls(
+            model_name=model_name or os.environ.get("MODEL_NAME", DEFAULT_MODEL_NAME),
+            api_key=api_key or os.environ.get("GROQ_API_KEY"),
+            repo_path=os.environ.get("REPO_PATH", DEFAULT_REPO_PATH),
+            file_path=os.environ.get("FILE_PATH", "")
+        )
+
+
+@lru_cache(maxsize=1)
+def default_config() -> AgentConfig:
+    """Process-wide config, read and validated on first use (main() calls it at startup)"""
+    return AgentConfig.from_env()
+
 
 # ============================================================================
 # Factor 4: Tools are structured outputs - Type-safe definitions
@@ -60,11 +157,11 @@ class ToolResult(Enum):
     EMPTY = "empty"
 
 
-@dataclass
+@dataclass(slots=True)
 class GitLogResult:
     """Structured output from git log tool"""
     status: ToolResult
-    commits: List[str]
+    commits: List[bytes]  # raw `<sha>\t<subject>` records, decoded only in to_context
     error_message: Optional[str] = None
     commit_count: int = 0
     
@@ -74,42 +171,50 @@ class GitLogResult:
             return f"Error accessing repository: {self.error_message}"
         if self.status == ToolResult.EMPTY:
             return "No commits found in the repository."
-        return f"Found {self.commit_count} commits:\n" + "\n".join(self.commits)
+        header = f"Found {self.commit_count} commits:\n".encode()
+        return (header + b"\n".join(self.commits)).decode("utf-8", errors="replace")
+
+
+class ReleaseNotesError(Exception):
+    """Release notes could not be generated (e.g. the repository is unreadable)"""
 
 
 # ============================================================================
 # Factor 3: Own your context window - Explicit context management
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class AgentContext:
-    """Explicit context window management"""
-    system_prompt: str
+    """Explicit context window management for the Runner input
+    
+    The system prompt is sent separately as the Agent's instructions (see
+    build_agent). The static task instructions come first here and are
+    byte-identical across runs, so provider prefix caches can hit. Everything
+    that varies per request lives in user_request, after the static prefix.
+    Provider-specific cache markers are added by prompt_cache_settings, not here.
+    """
+    task_prompt: str
     user_request: str
-    tool_results: List[Dict[str, Any]]
+    tool_results: List[str] = field(default_factory=list)  # JSON, serialized once in add_tool_result
     
-    def to_messages(self) -> List[Dict[str, str]]:
-        """Convert context to message format"""
-        messages = [
-            {"role": "system", "content": self.system_prompt},
+    def to_input_items(self) -> List[Dict[str, str]]:
+        """Convert context to Runner input (system prompt goes via Agent instructions)"""
+        items = [
+            {"role": "user", "content": self.task_prompt},
             {"role": "user", "content": self.user_request}
         ]
-        
-        # Add tool results to context
+        # Pre-fetched tool output is user-supplied data, never an assistant
+        # turn (a trailing assistant message would be treated as a prefill)
         for result in self.tool_results:
-            messages.append({
-                "role": "assistant",
-                "content": json.dumps(result)
-            })
-        
-        return messages
+            items.append({"role": "user", "content": result})
+        return items
     
     def add_tool_result(self, tool_name: str, result: str) -> None:
-        """Add a tool result to context"""
-        self.tool_results.append({
-            "tool": tool_name,
-            "result": result
-        })
+        """Add a tool result to context, serialized once up front"""
+        self.tool_results.append(json.dumps(
+            {"tool": tool_name, "result": result},
+            separators=(",", ":")
+        ))
 
 
 # ============================================================================
@@ -117,92 +222,253 @@ class AgentContext:
 # Factor 9: Compact Errors into Context - Error handling
 # ============================================================================
 
-@function_tool(name_override="get_git_commits")
-def get_git_commits(ctx: RunContextWrapper[Any], directory: str, path: str, max_commits: int = 50) -> str:
-    """Fetch git commit history for a repository.
+GIT_TIMEOUT = 30  # seconds - Factor 9: Prevent hanging
+
+# On-disk caches: git log output (keyed by HEAD, so it never goes stale) and
+# final release notes (keyed by prompt + model + commit history)
+CACHE_DIR = os.path.join(
+    os.path.expanduser(os.environ.get("XDG_CACHE_HOME") or "~/.cache"),
+    "release_notes"
+)
+RESPONSE_CACHE_DIR = os.path.join(CACHE_DIR, "responses")
+
+
+# Factor 9: Known git failures mapped to compact messages. Matched in a single
+# scan by one compiled alternation rather than a growing chain of `in` checks.
+GIT_NO_COMMITS_MESSAGE = "Repository has no commits"
+GIT_ERROR_MESSAGES = {
+    "not a git repository": "Not a git repository",
+    "does not have any commits yet": GIT_NO_COMMITS_MESSAGE,
+    "unknown revision or path not in the working tree": "Unknown revision or path",
+    "bad revision": "Bad revision",
+    "permission denied": "Permission denied",
+    "detected dubious ownership": "Repository not trusted (see git safe.directory)",
+    "index.lock": "Repository is locked by another git process",
+}
+_GIT_ERROR_PATTERN = re.compile(
+    "|".join(map(re.escape, GIT_ERROR_MESSAGES)),
+    re.IGNORECASE
+)
+
+
+def compact_git_error(stderr: str) -> str:
+    """Reduce git stderr to a short, stable message"""
+    match = _GIT_ERROR_PATTERN.search(stderr)
+    if match:
+        return GIT_ERROR_MESSAGES[match.group(0).lower()]
+    return stderr or "Git command failed"
+
+
+def _run_git(cmd: List[str]) -> subprocess.CompletedProcess:
+    """Run a git command and capture its raw (bytes) output.
     
-    Args:
-        directory: Absolute path to the git repository
-        path: Optional path to specific file (use empty string for full repo)
-        max_commits: Maximum number of commits to retrieve (default: 50)
+    Uses posix_spawn (vfork-style, no page-table copy of the interpreter)
+    where available; subprocess is the fallback on other platforms.
+    """
+    if not hasattr(os, "posix_spawnp"):
+        return subprocess.run(
+            cmd,
+            capture_output=True,
+            timeout=GIT_TIMEOUT
+        )
     
-    Returns:
-        Formatted string with commit history or error message
+    # Pipes are created non-inheritable; dup2 onto 1/2 clears that in the child
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    try:
+        pid = os.posix_spawnp(cmd[0], cmd, os.environ, file_actions=[
+            (os.POSIX_SPAWN_DUP2, stdout_w, 1),
+            (os.POSIX_SPAWN_DUP2, stderr_w, 2),
+        ])
+    except BaseException:
+        os.close(stdout_r)
+        os.close(stderr_r)
+        raise
+    finally:
+        os.close(stdout_w)
+        os.close(stderr_w)
+    
+    # selectors (poll/epoll) rather than select.select, which rejects fds
+    # >= FD_SETSIZE in long-running processes with many open sockets
+    output = {stdout_r: [], stderr_r: []}
+    deadline = time.monotonic() + GIT_TIMEOUT
+    selector = selectors.DefaultSelector()
+    try:
+        selector.register(stdout_r, selectors.EVENT_READ)
+        selector.register(stderr_r, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                os.kill(pid, signal.SIGKILL)
+                raise subprocess.TimeoutExpired(cmd, GIT_TIMEOUT)
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, 65536)
+                if chunk:
+                    output[key.fd].append(chunk)
+                else:
+                    selector.unregister(key.fd)
+    finally:
+        selector.close()
+        os.close(stdout_r)
+        os.close(stderr_r)
+        _, status = os.waitpid(pid, 0)
+    
+    return subprocess.CompletedProcess(
+        cmd,
+        os.waitstatus_to_exitcode(status),
+        b"".join(output[stdout_r]),
+        b"".join(output[stderr_r])
+    )
+
+
+def _read_cache_file(cache_path: str) -> Optional[str]:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _write_cache_file(cache_path: str, content: Union[str, bytes]) -> None:
+    """Atomically write a cache entry; failures are logged, never raised"""
+    if isinstance(content, str):
+        # Always UTF-8: notes may contain emoji regardless of the locale encoding
+        content = content.encode("utf-8")
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        logger.debug("Could not write cache entry %s: %s", cache_path, e)
+
+
+@lru_cache(maxsize=16)
+def _git_log_args(max_commits: int) -> Tuple[str, ...]:
+    """`git log` arguments (after -C <dir>); full SHAs, tab-separated subject, NUL-terminated records"""
+    return ("log", f"-{max_commits}", "--format=%H%x09%s", "-z")
+
+
+def _git_log_cache_path(directory: str, path: str, max_commits: int) -> Optional[str]:
+    """Cache file for a git log query at the current HEAD (None if HEAD is unresolvable)"""
+    head = _run_git(["git", "-C", directory, "rev-parse", "HEAD"])
+    if head.returncode != 0:
+        return None
+    key = hashlib.blake2b(
+        "\0".join((directory, head.stdout.strip().decode(), path, str(max_commits))).encode(),
+        digest_size=16
+    ).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.log")
+
+
+def _parse_git_log(stdout: bytes) -> GitLogResult:
+    """Split NUL-terminated `<sha>\\t<subject>` records, leaving them as bytes"""
+    commits = [record for record in stdout.split(b"\0") if record]
+    if not commits:
+        return GitLogResult(
+            status=ToolResult.EMPTY,
+            commits=[]
+        )
+    return GitLogResult(
+        status=ToolResult.SUCCESS,
+        commits=commits,
+        commit_count=len(commits)
+    )
+
+
+def fetch_git_log(directory: str, path: str = "", max_commits: int = 50) -> GitLogResult:
+    """Fetch git commit history as a structured result.
+    
+    Results are cached on disk per (directory, path, max_commits, HEAD), so
+    repeated queries against an unchanged repository skip git log entirely.
     """
     # Input validation
     if not directory or not os.path.isabs(directory):
-        result = GitLogResult(
+        return GitLogResult(
             status=ToolResult.ERROR,
             commits=[],
             error_message="Directory must be an absolute path"
         )
-        return result.to_context()
     
     if not os.path.exists(directory):
-        result = GitLogResult(
+        return GitLogResult(
             status=ToolResult.ERROR,
             commits=[],
             error_message=f"Directory does not exist: {directory}"
         )
-        return result.to_context()
     
     # Build git command
-    cmd = ["git", "-C", directory, "log", "--oneline", "--no-decorate", f"-{max_commits}"]
+    cmd = ["git", "-C", directory, *_git_log_args(max_commits)]
     if path and path.strip():
         cmd.append(path)
     
     try:
+        cache_path = _git_log_cache_path(directory, path, max_commits)
+        if cache_path:
+            try:
+                with open(cache_path, "rb") as f:
+                    return _parse_git_log(f.read())
+            except OSError:
+                pass
+        
         # Execute git command
-        result_proc = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True,
-            timeout=30  # Factor 9: Prevent hanging
-        )
+        result_proc = _run_git(cmd)
         
         if result_proc.returncode != 0:
             # Factor 9: Compact error message
-            error_msg = result_proc.stderr.strip() or "Git command failed"
-            if "not a git repository" in error_msg:
-                error_msg = "Not a git repository"
-            result = GitLogResult(
+            stderr = result_proc.stderr.decode("utf-8", errors="replace").strip()
+            error_msg = compact_git_error(stderr)
+            if error_msg == GIT_NO_COMMITS_MESSAGE:
+                # A freshly initialised repository is an empty history, not a failure
+                return GitLogResult(
+                    status=ToolResult.EMPTY,
+                    commits=[]
+                )
+            return GitLogResult(
                 status=ToolResult.ERROR,
                 commits=[],
                 error_message=error_msg
             )
-            return result.to_context()
-        
-        commits = [line for line in result_proc.stdout.strip().split('\n') if line]
         
-        if not commits:
-            result = GitLogResult(
-                status=ToolResult.EMPTY,
-                commits=[]
-            )
-            return result.to_context()
-        
-        result = GitLogResult(
-            status=ToolResult.SUCCESS,
-            commits=commits,
-            commit_count=len(commits)
-        )
-        return result.to_context()
+        # Cache git's raw output; a hit is parsed exactly like a fresh run
+        if cache_path:
+            _write_cache_file(cache_path, result_proc.stdout)
+        return _parse_git_log(result_proc.stdout)
         
     except subprocess.TimeoutExpired:
-        result = GitLogResult(
+        return GitLogResult(
             status=ToolResult.ERROR,
             commits=[],
-            error_message="Git command timed out after 30s"
+            error_message=f"Git command timed out after {GIT_TIMEOUT}s"
         )
-        return result.to_context()
     except Exception as e:
         # Factor 9: Compact generic errors
-        result = GitLogResult(
+        return GitLogResult(
             status=ToolResult.ERROR,
             commits=[],
             error_message=f"Unexpected error: {type(e).__name__}"
         )
-        return result.to_context()
+
+
+@function_tool(name_override="get_git_commits")
+def get_git_commits(ctx: RunContextWrapper[Any], directory: str, path: str, max_commits: int = 50) -> str:
+    """Fetch git commit history for a repository.
+    
+    Args:
+        directory: Absolute path to the git repository
+        path: Optional path to specific file (use empty string for full repo)
+        max_commits: Maximum number of commits to retrieve (default: 50)
+    
+    Returns:
+        Formatted string with commit history or error message
+    """
+    return fetch_git_log(directory, path, max_commits).to_context()
 
 
 # ============================================================================
@@ -210,34 +476,120 @@ def get_git_commits(ctx: RunContextWrapper[Any], directory: str, path: str, max_
 # Factor 10: Small, Focused Agents - Single responsibility
 # ============================================================================
 
+# Histories shorter than this are listed verbatim instead of summarized by the LLM
+MIN_COMMITS_FOR_LLM = 3
+
+
+def render_trivial_release_notes(git_log: GitLogResult) -> str:
+    """Templated notes for empty and very short histories"""
+    if git_log.status == ToolResult.EMPTY:
+        return f"No release notes: {git_log.to_context()}"
+    subjects = [commit.partition(b"\t")[2].decode("utf-8", errors="replace") for commit in git_log.commits]
+    changes = "\n".join(f"- {subject}" for subject in subjects)
+    return f"## Changes\n\n{changes}\n"
+
+
+# Providers LiteLLM serves through its own httpx handler, which accepts a
+# pooled AsyncHTTPHandler per call via `client=` (OpenAI-route providers
+# expect an OpenAI SDK client there instead, so they keep LiteLLM's default)
+HTTP_CLIENT_PROVIDERS = ("groq/", "anthropic/")
+
+# Connections belong to the event loop that opened them, so each loop gets its
+# own pool (with the parked generator that closes it); entries go with the loop
+_http_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+async def _close_at_loop_shutdown(client: "AsyncHTTPHandler") -> AsyncIterator[None]:
+    """Parked async generator; the loop finalizes it in shutdown_asyncgens()
+    (run by asyncio.run), which closes the pool on its own loop"""
+    try:
+        yield
+    finally:
+        await client.close()
+
+
+async def shared_http_client() -> "AsyncHTTPHandler":
+    """Keep-alive connection pool for LiteLLM calls on the running event loop.
+    
+    Repeated API/webhook invocations on the same loop reuse warm TLS
+    connections instead of paying a fresh handshake to the provider each time.
+    The pool is handed to LiteLLM per call (see ReleaseNotesAgent._run_config),
+    never installed globally, so loops in other threads are unaffected.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _http_clients.get(loop)
+    if entry is None:
+        import httpx
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+        
+        client = AsyncHTTPHandler(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            concurrent_limit=16
+        )
+        closer = _close_at_loop_shutdown(client)
+        await closer.asend(None)
+        entry = _http_clients[loop] = (client, closer)
+    return entry[0]
+
+
+async def close_shared_http_client() -> None:
+    """Close the running loop's pool now instead of at loop shutdown"""
+    entry = _http_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+
+@lru_cache(maxsize=8)
+def build_agent(config: AgentConfig) -> Agent:
+    """Build the release notes Agent, shared by every caller with the same model/key.
+    
+    Agents hold no per-run state, so one instance (and its tool schema and
+    model client) can serve all requests in a webhook or cron process.
+    """
+    from agents.extensions.models.litellm_model import LitellmModel
+    
+    return Agent(
+        name="Release Notes Writer",
+        instructions=SYSTEM_PROMPT,
+        tools=[get_git_commits],
+        model=LitellmModel(model=config.model_name, api_key=config.api_key),
+        model_settings=prompt_cache_settings(config.model_name)
+    )
+
+
 class ReleaseNotesAgent:
     """
     Small, focused agent for generating release notes.
     Factor 10: Does one thing well - converts git history to release notes
     """
     
-    def __init__(self, model_name: str = None, api_key: str = None):
+    def __init__(
+        self,
+        model_name: str = None,
+        api_key: str = None,
+        config: Optional[AgentConfig] = None
+    ):
         """Initialize agent with explicit configuration.
         
         Factor 2: Own your prompts - Explicit system prompt
         Factor 6: Launch/Pause/Resume - Stateless initialization
         """
-        self.model_name = model_name or os.environ.get("MODEL_NAME", "groq/openai/gpt-oss-120b")
-        self.api_key = api_key or os.environ.get("GROQ_API_KEY")
-        
-        if not self.api_key:
-            raise ValueError("API key required: set GROQ_API_KEY environment variable")
+        if config is None:
+            config = (
+                AgentConfig.from_env(model_name, api_key)
+                if model_name or api_key else default_config()
+            )
+        self.config = config
+        self.model_name = config.model_name
+        self.api_key = config.api_key
         
         # Factor 2: Own your prompts
         self.system_prompt = SYSTEM_PROMPT
-        
-        # Initialize agent with explicit configuration
-        self.agent = Agent(
-            name="Release Notes Writer",
-            instructions=self.system_prompt,
-            tools=[get_git_commits],
-            model=LitellmModel(model=self.model_name, api_key=self.api_key)
-        )
+    
+    @cached_property
+    def agent(self) -> Agent:
+        """Resolved on first use, so trivial and cached requests never load LiteLLM"""
+        return build_agent(self.config)
     
     async def generate_release_notes(
         self, 
@@ -258,25 +610,151 @@ class ReleaseNotesAgent:
             
         Returns:
             Formatted release notes as string
+            
+        Raises:
+            ReleaseNotesError: If the commit history could not be read
+        """
+        chunks = [
+            chunk async for chunk in
+            self.stream_release_notes(repository_path, file_path, max_commits)
+        ]
+        return "".join(chunks)
+    
+    async def stream_release_notes(
+        self,
+        repository_path: str,
+        file_path: str = "",
+        max_commits: int = 50
+    ) -> AsyncIterator[str]:
         """
-        # Factor 3: Own your context window - Build explicit context
-        user_request = f"""Generate release notes for the git repository at: {repository_path}
+        Generate release notes, yielding text as soon as it is available.
         
+        LLM output is streamed token by token, so callers see text at
+        time-to-first-token. Templated and cached notes arrive as one chunk.
+        Takes the same arguments as generate_release_notes.
+        """
+        # Factor 3: Own your context window - Build explicit context.
+        # Only the trailing message varies between requests.
+        context = AgentContext(
+            task_prompt=TASK_PROMPT,
+            user_request=f"""Repository: {repository_path}
 File filter: {file_path or "entire repository"}
-Max commits to analyze: {max_commits}
-
-Use the get_git_commits tool to fetch the commit history, then create professional release notes."""
+Max commits to analyze: {max_commits}"""
+        )
+        
+        # Factor 8: Explicit control flow - fetch commits up front instead of
+        # waiting for the model to ask, so trivial or cached cases skip the LLM
+        # (in a worker thread, so concurrent runs keep the event loop free)
+        git_log = await asyncio.to_thread(fetch_git_log, repository_path, file_path, max_commits)
+        if git_log.status == ToolResult.ERROR:
+            raise ReleaseNotesError(git_log.to_context())
+        if git_log.status == ToolResult.EMPTY or git_log.commit_count < MIN_COMMITS_FOR_LLM:
+            yield render_trivial_release_notes(git_log)
+            return
+        
+        commits_context = git_log.to_context()
+        context.add_tool_result("get_git_commits", commits_context)
+        
+        # Cache I/O runs in worker threads, like the git fetch, so batch runs
+        # are never blocked on disk
+        cache_path = self._response_cache_path(commits_context)
+        cached = await asyncio.to_thread(_read_cache_file, cache_path)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Cache exactly what was streamed, so cache hits match the first run
+        streamed: List[str] = []
+        result = Runner.run_streamed(
+            self.agent,
+            context.to_input_items(),
+            run_config=await self._run_config()
+        )
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                streamed.append(event.data.delta)
+                yield event.data.delta
+        log_prompt_cache_usage(result)
+        
+        # An empty reply (e.g. reasoning only) must not be served forever
+        notes = "".join(streamed)
+        if notes.strip():
+            await asyncio.to_thread(_write_cache_file, cache_path, notes)
+    
+    async def generate_release_notes_batch(
+        self,
+        paths: List[Tuple[str, str]],
+        concurrency: int = 4,
+        max_commits: int = 50
+    ) -> List[Union[str, Exception]]:
+        """
+        Generate release notes for several repositories concurrently.
         
-        # Factor 8: Explicit control flow
-        result = await Runner.run(self.agent, user_request)
+        Factor 12: Stateless reducer - independent runs fan out safely
         
-        return result.final_output
+        Args:
+            paths: (repository_path, file_path) pairs
+            concurrency: Maximum number of generations in flight at once (>= 1)
+            max_commits: Maximum commits to analyze per repository
+            
+        Returns:
+            One entry per path, in the same order: the release notes, or the
+            exception that repository failed with (e.g. ReleaseNotesError).
+            One failing repository does not affect the others.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def generate(repository_path: str, file_path: str) -> str:
+            async with semaphore:
+                return await self.generate_release_notes(repository_path, file_path, max_commits)
+        
+        return await asyncio.gather(
+            *(generate(repo, path) for repo, path in paths),
+            return_exceptions=True
+        )
+    
+    async def _run_config(self) -> Optional[RunConfig]:
+        """Per-run settings: hand this loop's pooled HTTP client to LiteLLM"""
+        if not self.model_name.startswith(HTTP_CLIENT_PROVIDERS):
+            return None
+        # Merged over the Agent's model_settings (extra_args dicts are combined)
+        return RunConfig(model_settings=ModelSettings(
+            extra_args={"client": await shared_http_client()}
+        ))
+    
+    def _response_cache_path(self, commits_context: str) -> str:
+        """Release notes are a pure function of prompts, model and commit history"""
+        key = hashlib.blake2b(
+            "\0".join((self.system_prompt, TASK_PROMPT, self.model_name, commits_context)).encode(),
+            digest_size=16
+        ).hexdigest()
+        return os.path.join(RESPONSE_CACHE_DIR, f"{key}.md")
 
 
 # ============================================================================
 # Factor 11: Trigger from anywhere - Flexible invocation patterns
 # ============================================================================
 
+OUTPUT_FLUSH_EVERY = 16  # streamed chunks between output file writes
+
+
+def _write_and_flush(f: TextIO, text: str) -> None:
+    f.write(text)
+    f.flush()
+
+
+@lru_cache(maxsize=1)
+def _iso_timestamp(epoch_seconds: int) -> str:
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).isoformat()
+
+
+def _utcnow_iso() -> str:
+    """Current UTC time, second precision; bursts within a second share one string"""
+    return _iso_timestamp(int(time.time()))
+
+
 async def generate_release_notes_cli(
     repository_path: str,
     file_path: str = "",
@@ -285,16 +763,44 @@ async def generate_release_notes_cli(
     """
     CLI-friendly interface for generating release notes.
     Factor 11: Can be called from CLI, API, webhook, cron, etc.
+    Raises ReleaseNotesError if the commit history could not be read.
     """
     agent = ReleaseNotesAgent()
-    notes = await agent.generate_release_notes(repository_path, file_path)
+    chunks: List[str] = []
+    written = 0
+    
+    # Stream to stdout and the output file as the model generates. File I/O
+    # runs in worker threads so it never blocks other work on the event loop.
+    # The file is streamed into a temp file beside the target and only moved
+    # into place once the notes are complete, so a failed run never empties
+    # or half-overwrites existing notes.
+    f = None
+    if output_file:
+        tmp_path = f"{output_file}.{os.getpid()}.tmp"
+        f = await asyncio.to_thread(open, tmp_path, 'w', encoding="utf-8")
+    try:
+        async for chunk in agent.stream_release_notes(repository_path, file_path):
+            chunks.append(chunk)
+            print(chunk, end="", flush=True)
+            if f and len(chunks) - written >= OUTPUT_FLUSH_EVERY:
+                await asyncio.to_thread(_write_and_flush, f, "".join(chunks[written:]))
+                written = len(chunks)
+        if f:
+            await asyncio.to_thread(_write_and_flush, f, "".join(chunks[written:]))
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.replace, tmp_path, output_file)
+    except BaseException:
+        if f:
+            f.close()
+            with suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+        raise
+    print()
     
     if output_file:
-        with open(output_file, 'w') as f:
-            f.write(notes)
         print(f"Release notes written to: {output_file}")
     
-    return notes
+    return "".join(chunks)
 
 
 async def generate_release_notes_api(
@@ -305,15 +811,25 @@ async def generate_release_notes_api(
     API-friendly interface returning structured data.
     Factor 11: Same core logic, different interface
     """
+    generated_at = _utcnow_iso()
     agent = ReleaseNotesAgent()
-    notes = await agent.generate_release_notes(repository_path, file_path)
+    try:
+        notes = await agent.generate_release_notes(repository_path, file_path)
+    except ReleaseNotesError as e:
+        return {
+            "status": "error",
+            "repository": repository_path,
+            "file_path": file_path,
+            "error": str(e),
+            "generated_at": generated_at
+        }
     
     return {
         "status": "success",
         "repository": repository_path,
         "file_path": file_path,
         "release_notes": notes,
-        "generated_at": "2026-01-14"  # In production, use actual timestamp
+        "generated_at": generated_at
     }
 
 
@@ -327,17 +843,22 @@ async def main():
     Factor 12: Stateless - no shared state, can be resumed
     """
     # Configuration from environment (Factor 2)
-    repo_path = os.environ.get("REPO_PATH", "/Users/annhoward/src/docusign_clone")
-    file_path = os.environ.get("FILE_PATH", "")
+    config = default_config()
+    repo_path = config.repo_path
+    file_path = config.file_path
     
     print(f"Generating release notes for: {repo_path}")
     print("-" * 60)
     
-    # Factor 11: Trigger from anywhere
-    agent = ReleaseNotesAgent()
-    notes = await agent.generate_release_notes(repo_path, file_path)
+    # Factor 11: Trigger from anywhere - streams notes as they are generated
+    try:
+        notes = await generate_release_notes_cli(repo_path, file_path)
+    except ReleaseNotesError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    finally:
+        await close_shared_http_client()
     
-    print(notes)
     print("-" * 60)
     print("✅ Release notes generated successfully")
     